@@ -3,11 +3,77 @@
 from __future__ import annotations
 
 import argparse
+import logging
 import sys
 import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator
 
-from bughunter.csv_io import load_input_csv, write_output_csv
+from bughunter.config import MAX_WORKERS, STATIC_BATCH_SIZE
+from bughunter.csv_io import load_input_csv, output_csv_writer
 from bughunter.graph import build_graph
+from bughunter.llm import usage_totals
+from bughunter.nodes.code_analyzer import batch_static_analysis
+
+log = logging.getLogger("bughunter")
+
+
+def _with_static_hints(rows: Iterable[dict], batch_size: int) -> Iterator[dict]:
+    """Attach static analysis to each row, running the tools once per batch."""
+    it = iter(rows)
+    while batch := list(islice(it, batch_size)):
+        reports = batch_static_analysis([row["code"] for row in batch])
+        for row, report in zip(batch, reports):
+            row["static_analysis"] = report
+            yield row
+
+
+def _process_row(app, row: dict, idx: int) -> dict:
+    """Run one CSV row through the graph and return its output record."""
+    row_id = row["id"]
+    log.info("[%d] Processing ID=%s", idx, row_id)
+    t0 = time.time()
+    cache_hit = False
+
+    try:
+        initial_state = {
+            "id": row["id"],
+            "code": row["code"],
+            "context": row["context"],
+            "iteration": 0,
+            "max_iterations": 2,
+        }
+        if row.get("correct_code"):
+            initial_state["correct_code"] = row["correct_code"]
+        if row.get("explanation"):
+            initial_state["explanation"] = row["explanation"]
+        if "static_analysis" in row:
+            initial_state["static_analysis"] = row["static_analysis"]
+
+        final_state = app.invoke(initial_state)
+        cache_hit = bool(final_state.get("llm_cache_hit"))
+
+        result = {
+            "id": final_state.get("id", row_id),
+            "bug_line": final_state.get("bug_line", "Unable to identify"),
+            "bug_explanation": final_state.get(
+                "bug_explanation", "Analysis failed"
+            ),
+        }
+    except Exception as e:
+        log.error("  Error processing ID=%s: %s", row_id, e)
+        result = {
+            "id": row_id,
+            "bug_line": "ERROR",
+            "bug_explanation": f"Processing error: {e}",
+        }
+
+    elapsed = time.time() - t0
+    suffix = " (cached)" if cache_hit else ""
+    log.info("  ID=%s done in %.1fs%s", row_id, elapsed, suffix)
+    return result
 
 
 def main() -> None:
@@ -20,64 +86,59 @@ def main() -> None:
     parser.add_argument(
         "--output", "-o", default="output.csv", help="Path to output CSV file"
     )
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=MAX_WORKERS,
+        help="Number of rows processed concurrently",
+    )
+    parser.add_argument(
+        "--verbose",
+        "-v",
+        action="store_true",
+        help="Show per-node diagnostics",
+    )
     args = parser.parse_args()
 
-    rows = load_input_csv(args.input)
-    print(f"Loaded {len(rows)} rows from {args.input}")
+    logging.basicConfig(format="%(message)s", level=logging.WARNING)
+    logging.getLogger("bughunter").setLevel(
+        logging.DEBUG if args.verbose else logging.INFO
+    )
+
+    rows = _with_static_hints(
+        load_input_csv(args.input), max(1, STATIC_BATCH_SIZE)
+    )
+    log.info("Reading rows from %s", args.input)
 
     app = build_graph()
 
-    results: list[dict] = []
-    total = len(rows)
-
-    for idx, row in enumerate(rows, 1):
-        row_id = row["id"]
-        print(f"[{idx}/{total}] Processing ID={row_id}")
-        t0 = time.time()
-
-        try:
-            initial_state = {
-                "id": row["id"],
-                "code": row["code"],
-                "context": row["context"],
-                "iteration": 0,
-                "max_iterations": 2,
-            }
-            if row.get("correct_code") and row["correct_code"] != "nan":
-                initial_state["correct_code"] = row["correct_code"]
-            if row.get("explanation") and row["explanation"] != "nan":
-                initial_state["explanation"] = row["explanation"]
-
-            final_state = app.invoke(initial_state)
-
-            results.append(
-                {
-                    "id": final_state.get("id", row_id),
-                    "bug_line": final_state.get("bug_line", "Unable to identify"),
-                    "bug_explanation": final_state.get(
-                        "bug_explanation", "Analysis failed"
-                    ),
-                }
-            )
-        except Exception as e:
-            print(f"  Error processing ID={row_id}: {e}")
-            results.append(
-                {
-                    "id": row_id,
-                    "bug_line": "ERROR",
-                    "bug_explanation": f"Processing error: {e}",
-                }
-            )
-
-        elapsed = time.time() - t0
-        print(f"  Done in {elapsed:.1f}s")
-
-        if idx < total:
-            wait_s = 5
-            print(f"  Waiting {wait_s}s for rate limit cooldown ...")
-            time.sleep(wait_s)
-
-    write_output_csv(results, args.output)
+    workers = max(1, args.workers)
+    # Bound the rows in flight so memory stays flat for large inputs.
+    window = workers * 2
+    pending: deque[Future] = deque()
+
+    # LLM calls are paced by the shared token bucket in bughunter.llm,
+    # so rows can run concurrently without a fixed cooldown between them.
+    # Results are written in input order as soon as they are ready.
+    with ThreadPoolExecutor(max_workers=workers) as executor, output_csv_writer(
+        args.output
+    ) as write_row:
+        for idx, row in enumerate(rows, 1):
+            pending.append(executor.submit(_process_row, app, row, idx))
+            if len(pending) >= window:
+                write_row(pending.popleft().result())
+        while pending:
+            write_row(pending.popleft().result())
+
+    usage = usage_totals()
+    log.info(
+        "LLM usage: %d calls, %d input tokens (%d cached), %d output tokens",
+        usage.get("calls", 0),
+        usage.get("input_tokens", 0),
+        usage.get("cached_input_tokens", 0),
+        usage.get("output_tokens", 0),
+    )
 
 
 if __name__ == "__main__":
@@ -8,6 +8,13 @@ load_dotenv()
 GROQ_API_KEY: str = os.getenv("GROQ_API_KEY", "")
 GROQ_MODEL: str = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
 MCP_SERVER_URL: str = os.getenv("MCP_SERVER_URL", "http://localhost:8003/sse")
+# Provider request budget shared by all worker threads.
+GROQ_RPM: int = int(os.getenv("GROQ_RPM", "30"))
+MAX_WORKERS: int = int(os.getenv("BUGHUNTER_WORKERS", "4"))
+# Rows whose static analysis shares one process per tool.
+STATIC_BATCH_SIZE: int = int(os.getenv("BUGHUNTER_STATIC_BATCH", "16"))
+# SQLite file for cached LLM responses; set to an empty string to disable.
+LLM_CACHE_PATH: str = os.getenv("LLM_CACHE_PATH", ".bughunter_cache.sqlite")
 
 if not GROQ_API_KEY:
     raise EnvironmentError("GROQ_API_KEY is not set. Add it to your .env file.")
@@ -2,46 +2,78 @@
 
 from __future__ import annotations
 
-import pandas as pd
+import csv
+import logging
+import os
+from contextlib import contextmanager
 from pathlib import Path
+from typing import IO, Callable, Iterator
 
+log = logging.getLogger(__name__)
 
-def load_input_csv(path: str | Path) -> list[dict]:
-    """Read the input CSV and return a list of row-dicts.
+# Output record key -> CSV column header
+OUTPUT_COLUMNS = {
+    "id": "ID",
+    "bug_line": "Bug Line",
+    "bug_explanation": "Explanation",
+}
+
+
+def load_input_csv(path: str | Path) -> Iterator[dict]:
+    """Validate the input CSV header and return an iterator of row-dicts.
 
     Expected columns: ID, Code, Context
     Optional columns: Correct Code, Explanation (used if present)
+
+    Rows are read lazily, so memory use does not grow with the file size.
     """
-    df = pd.read_csv(path)
+    f = open(path, newline="", encoding="utf-8-sig", buffering=1 << 20)
+    reader = csv.DictReader(f)
     required = {"ID", "Code", "Context"}
-    missing = required - set(df.columns)
+    missing = required - set(reader.fieldnames or [])
     if missing:
+        f.close()
         raise ValueError(f"Input CSV is missing columns: {missing}")
+    return _iter_rows(f, reader)
 
-    rows: list[dict] = []
-    for _, row in df.iterrows():
-        rows.append(
-            {
-                "id": str(row["ID"]),
-                "code": str(row["Code"]),
-                "correct_code": str(row.get("Correct Code", "")),
-                "context": str(row["Context"]),
-                "explanation": str(row.get("Explanation", "")),
+
+def _iter_rows(f: IO[str], reader: csv.DictReader) -> Iterator[dict]:
+    with f:
+        for row in reader:
+            # DictReader fills the cells missing from a short row with None
+            yield {
+                "id": row["ID"] or "",
+                "code": row["Code"] or "",
+                "correct_code": row.get("Correct Code") or "",
+                "context": row["Context"] or "",
+                "explanation": row.get("Explanation") or "",
             }
-        )
-    return rows
-
-
-def write_output_csv(results: list[dict], path: str | Path) -> None:
-    """Write the output CSV with columns: ID, Bug Line, Explanation."""
-    df = pd.DataFrame(results)
-    df = df.rename(
-        columns={
-            "id": "ID",
-            "bug_line": "Bug Line",
-            "bug_explanation": "Explanation",
-        }
-    )
-    df = df[["ID", "Bug Line", "Explanation"]]
-    df.to_csv(path, index=False)
-    print(f"Output written to {path} ({len(df)} rows)")
+
+
+@contextmanager
+def output_csv_writer(
+    path: str | Path, fsync_every: int = 20
+) -> Iterator[Callable[[dict], None]]:
+    """Open the output CSV (ID, Bug Line, Explanation) and yield a row writer.
+
+    Each result is written and flushed as soon as it is passed in, and the
+    file is fsync'd every ``fsync_every`` rows, so a crash mid-run keeps the
+    rows already paid for.
+    """
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(OUTPUT_COLUMNS.values()))
+        writer.writeheader()
+
+        def write_row(result: dict) -> None:
+            nonlocal count
+            writer.writerow(
+                {col: result.get(key, "") for key, col in OUTPUT_COLUMNS.items()}
+            )
+            f.flush()
+            count += 1
+            if count % fsync_every == 0:
+                os.fsync(f.fileno())
+
+        yield write_row
+    log.info("Output written to %s (%d rows)", path, count)
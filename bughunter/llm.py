@@ -2,14 +2,97 @@
 
 from __future__ import annotations
 
+import functools
+import logging
+import random
+import threading
 import time
+from collections import Counter
 from langchain_groq import ChatGroq
-from langchain_core.messages import BaseMessage
-from bughunter.config import GROQ_API_KEY, GROQ_MODEL
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from bughunter.config import GROQ_API_KEY, GROQ_MODEL, GROQ_RPM
+
+log = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Thread-safe token bucket that paces requests to a steady rate."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._updated:
+                    # Paused after a rate-limit response
+                    wait = self._updated - now
+                else:
+                    self._tokens = min(
+                        self.capacity, self._tokens + (now - self._updated) * self.rate
+                    )
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for ``seconds`` and drop any saved burst."""
+        with self._lock:
+            self._tokens = 0
+            self._updated = max(self._updated, time.monotonic() + seconds)
+
+
+_bucket = TokenBucket(rate=GROQ_RPM / 60, capacity=3)
+
+# Running token totals across every LLM call in the process
+_usage: Counter[str] = Counter()
+_usage_lock = threading.Lock()
+
+
+def _record_usage(response: AIMessage) -> None:
+    """Log one response's token counts and add them to the running totals."""
+    usage = response.usage_metadata or {}
+    input_tokens = usage.get("input_tokens", 0)
+    cached = usage.get("input_token_details", {}).get("cache_read") or 0
+    output_tokens = usage.get("output_tokens", 0)
+    log.debug(
+        "  tokens: in=%d cached_read=%d out=%d", input_tokens, cached, output_tokens
+    )
+    with _usage_lock:
+        _usage.update(
+            calls=1,
+            input_tokens=input_tokens,
+            cached_input_tokens=cached,
+            output_tokens=output_tokens,
+        )
+
+
+def usage_totals() -> dict[str, int]:
+    """Return the token totals (calls, input, cached input, output) so far."""
+    with _usage_lock:
+        return dict(_usage)
 
 
 def get_llm(temperature: float = 0) -> ChatGroq:
-    """Return a configured ChatGroq instance."""
+    """Return a shared ChatGroq instance for the given temperature.
+
+    The client is reused across rows and threads so its HTTP connection
+    pool stays warm.
+    """
+    return _build_llm(float(temperature))
+
+
+@functools.lru_cache(maxsize=8)
+def _build_llm(temperature: float) -> ChatGroq:
     return ChatGroq(
         model=GROQ_MODEL,
         api_key=GROQ_API_KEY,
@@ -17,24 +100,67 @@ def get_llm(temperature: float = 0) -> ChatGroq:
     )
 
 
+def warmup() -> None:
+    """Open the shared client's connection with a one-token request.
+
+    Opt-in, for long-lived callers that can issue it while other work is
+    still pending: the ping is billed and takes a rate-limit token, so the
+    CLI does not call it. Failures are only logged.
+    """
+    try:
+        _bucket.acquire()
+        response = get_llm(0).invoke([HumanMessage(content="ping")], max_tokens=1)
+        _record_usage(response)
+    except Exception as e:
+        log.debug("LLM warmup failed: %s", e)
+
+
+def _retry_after(error: Exception) -> float | None:
+    """Return the provider's Retry-After hint in seconds, if it sent one."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
 def invoke_with_retry(
     llm: ChatGroq,
     messages: list[BaseMessage],
     max_retries: int = 3,
     base_delay: float = 10.0,
+    max_delay: float = 60.0,
 ) -> str:
-    """Invoke the LLM with exponential backoff on rate-limit errors."""
+    """Invoke the LLM with exponential backoff on rate-limit errors.
+
+    Every attempt first takes a token from the shared bucket, so concurrent
+    workers together stay within GROQ_RPM. A rate-limit response pauses the
+    bucket for all workers, honouring the provider's Retry-After header when
+    present and otherwise backing off exponentially with jitter.
+    """
     for attempt in range(max_retries):
         try:
+            _bucket.acquire()
             response = llm.invoke(messages)
+            _record_usage(response)
             return response.content
         except Exception as e:
             error_str = str(e)
             if "rate_limit" in error_str or "413" in error_str or "429" in error_str:
-                delay = base_delay * (2 ** attempt)
-                print(f"  Rate limited (attempt {attempt + 1}/{max_retries}), retrying in {delay:.0f}s")
-                time.sleep(delay)
+                delay = _retry_after(e)
+                if delay is None:
+                    delay = base_delay * (2 ** attempt) + random.uniform(0, base_delay)
+                delay = min(delay, max_delay)
+                log.warning(
+                    "  Rate limited (attempt %d/%d), retrying in %.0fs",
+                    attempt + 1,
+                    max_retries,
+                    delay,
+                )
+                _bucket.pause(delay)
             else:
                 raise
+    _bucket.acquire()
     response = llm.invoke(messages)
+    _record_usage(response)
     return response.content
@@ -0,0 +1,83 @@
+"""Persistent on-disk cache for LLM responses, keyed by the full request."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Callable
+
+from langchain_groq import ChatGroq
+from langchain_core.messages import BaseMessage
+
+from bughunter.config import LLM_CACHE_PATH
+from bughunter.llm import invoke_with_retry
+
+_lock = threading.Lock()
+_conn: sqlite3.Connection | None = None
+
+
+def _connect() -> sqlite3.Connection:
+    """Open the cache database on first use and make sure the table exists."""
+    global _conn
+    if _conn is None:
+        _conn = sqlite3.connect(LLM_CACHE_PATH, check_same_thread=False)
+        _conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache"
+            " (key TEXT PRIMARY KEY, value TEXT, ts REAL)"
+        )
+        _conn.commit()
+    return _conn
+
+
+def _cache_key(
+    messages: list[BaseMessage], model: str, temperature: float
+) -> str:
+    payload = json.dumps(
+        {
+            "model": model,
+            "temperature": temperature,
+            "messages": [(m.type, m.content) for m in messages],
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cached_invoke(
+    llm: ChatGroq,
+    messages: list[BaseMessage],
+    model: str,
+    temperature: float,
+    accept: Callable[[str], bool] | None = None,
+) -> tuple[str, bool]:
+    """Invoke the LLM, serving byte-identical requests from the on-disk cache.
+
+    Returns the response text and whether it was a cache hit. When
+    ``accept`` is given, only responses it approves are stored or served
+    from the cache, so a one-off bad generation is retried on the next run.
+    """
+    if not LLM_CACHE_PATH:
+        return invoke_with_retry(llm, messages), False
+
+    key = _cache_key(messages, model, temperature)
+    with _lock:
+        row = _connect().execute(
+            "SELECT value FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+    if row is not None and (accept is None or accept(row[0])):
+        return row[0], True
+
+    text = invoke_with_retry(llm, messages)
+    if accept is not None and not accept(text):
+        return text, False
+    with _lock:
+        conn = _connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, ts) VALUES (?, ?, ?)",
+            (key, text, time.time()),
+        )
+        conn.commit()
+    return text, False
@@ -2,15 +2,24 @@
 
 from __future__ import annotations
 
+import atexit
+import logging
+import os
 import re
+import shutil
 import subprocess
 import tempfile
-from pathlib import Path
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from langchain_core.messages import SystemMessage, HumanMessage
 
-from bughunter.llm import get_llm, invoke_with_retry
-from bughunter.state import BugHunterState
+from bughunter.config import GROQ_MODEL
+from bughunter.llm import get_llm
+from bughunter.llm_cache import cached_invoke
+from bughunter.state import BugHunterState, Candidate
+
+log = logging.getLogger(__name__)
 
 
 SYSTEM_PROMPT = """\
@@ -49,36 +58,132 @@ CANDIDATES:
 <line_number>|<line_content>|<what is wrong and what it should be>
 """
 
-def _try_cpplint(code: str) -> str:
-    """Run cpplint if available; return output or empty string."""
+# Snippets shorter than this skip the static tools; their hints are
+# almost entirely style noise and not worth a subprocess per row.
+MIN_STATIC_ANALYSIS_CHARS = 200
+
+# Section labels in the LLM response
+_SECTION_RE = re.compile(r"(APIS|CANDIDATES):")
+# "<line_number>|<line_content>|<reason>" rows in the CANDIDATES section
+_CAND_LINE_RE = re.compile(r"^([^|\n]*)\|([^|\n]*)\|(.*)$", re.MULTILINE)
+
+# Method calls such as ".vecEditMode(" in a candidate line
+_CALL_RE = re.compile(r"\.(\w+)\s*\(")
+
+
+# One scratch directory per process for the files handed to the tools
+_TMPDIR = tempfile.mkdtemp(prefix="bughunter-")
+atexit.register(shutil.rmtree, _TMPDIR, ignore_errors=True)
+
+# Snippet file names written for the tools; lets output be routed per snippet
+_SNIPPET_FILE_RE = re.compile(r"snippet_(\d+)\.cpp\b")
+
+# Static analysis reports per snippet, oldest first, so repeated code
+# within a run does not spawn the tools again
+_STATIC_MEMO: dict[str, str] = {}
+_STATIC_MEMO_LOCK = threading.Lock()
+_STATIC_MEMO_SIZE = 1024
+
+
+def _filter_cpplint(output: str) -> str:
+    """Keep the relevant cpplint diagnostics."""
+    # Filter to relevant lines (skip "Done processing" etc)
+    filtered = [l for l in output.splitlines()
+               if l and not l.isspace()
+               and "Done processing" not in l and "Total errors" not in l]
+    return "\n".join(filtered[:15])  # Limit output
+
+
+# (name, argv without file paths, timeout in seconds per file,
+#  output stream, output filter)
+_STATIC_TOOLS = [
+    ("cpplint", ["cpplint", "--quiet"], 15, "stderr", _filter_cpplint),
+]
+
+
+def batch_static_analysis(codes: list[str]) -> list[str]:
+    """Run static analysis for several snippets with one process per tool.
+
+    Returns one labelled report per snippet, "" where there is nothing to
+    report. Snippets analysed earlier in the run, and repeats within the
+    batch, reuse the memoized report instead of being linted again.
+    """
+    with _STATIC_MEMO_LOCK:
+        reports = {code: _STATIC_MEMO[code] for code in codes if code in _STATIC_MEMO}
+    new = [code for code in dict.fromkeys(codes) if code not in reports]
+    if new:
+        fresh = dict(zip(new, _analyze_snippets(new)))
+        reports.update(fresh)
+        with _STATIC_MEMO_LOCK:
+            _STATIC_MEMO.update(fresh)
+            while len(_STATIC_MEMO) > _STATIC_MEMO_SIZE:
+                del _STATIC_MEMO[next(iter(_STATIC_MEMO))]
+    return [reports[code] for code in codes]
+
+
+def _analyze_snippets(codes: list[str]) -> list[str]:
+    """Lint distinct snippets, running every tool once over all of them.
+
+    Each snippet is written to its own file in the scratch directory, the
+    tools run concurrently, and each diagnostic is routed back to the
+    snippet whose file it names.
+    """
+    sections: list[list[str]] = [[] for _ in codes]
+    todo = [
+        i for i, code in enumerate(codes) if len(code) >= MIN_STATIC_ANALYSIS_CHARS
+    ]
+    if not todo:
+        return ["" for _ in codes]
+
     try:
-        with tempfile.NamedTemporaryFile(
-            suffix=".cpp", mode="w", delete=False, encoding="utf-8"
-        ) as tmp:
-            tmp.write(code)
-            tmp.flush()
-            result = subprocess.run(
-                ["cpplint", "--quiet", tmp.name],
-                capture_output=True,
-                text=True,
-                timeout=15,
-            )
-            Path(tmp.name).unlink(missing_ok=True)
-            output = result.stderr  # cpplint outputs to stderr
-            # Filter to relevant lines (skip "Done processing" etc)
-            filtered = [l for l in output.splitlines() 
-                       if l.strip() and "Done processing" not in l and "Total errors" not in l]
-            return "\n".join(filtered[:15])  # Limit output
-    except (FileNotFoundError, subprocess.TimeoutExpired, OSError):
-        return ""
+        # Files are per calling thread and overwritten in place on the next call
+        prefix = os.path.join(_TMPDIR, f"{threading.get_ident()}_")
+        paths: dict[int, str] = {}
+        for i in todo:
+            path = f"{prefix}snippet_{i}.cpp"
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(codes[i])
+            paths[i] = path
+
+        with ThreadPoolExecutor(max_workers=len(_STATIC_TOOLS)) as executor:
+            futures = [
+                (
+                    name,
+                    executor.submit(
+                        subprocess.run,
+                        [*argv, *paths.values()],
+                        capture_output=True,
+                        text=True,
+                        timeout=timeout * len(paths),
+                    ),
+                    stream,
+                    clean,
+                )
+                for name, argv, timeout, stream, clean in _STATIC_TOOLS
+            ]
+            for name, future, stream, clean in futures:
+                try:
+                    output = getattr(future.result(), stream)
+                except (FileNotFoundError, subprocess.TimeoutExpired, OSError):
+                    continue
+
+                by_snippet: dict[int, list[str]] = {}
+                for line in output.splitlines():
+                    m = _SNIPPET_FILE_RE.search(line)
+                    if m:
+                        by_snippet.setdefault(int(m.group(1)), []).append(line)
 
+                for i, path in paths.items():
+                    # Stable file name keeps the prompt (and its cache key) reproducible
+                    text = clean(
+                        "\n".join(by_snippet.get(i, [])).replace(path, "code.cpp")
+                    )
+                    if text:
+                        sections[i].append(f"[{name}]\n{text}")
+    except OSError:
+        return ["" for _ in codes]
 
-def _run_static_analysis(code: str) -> str:
-    """Run cpplint static analysis."""
-    cpplint_out = _try_cpplint(code)
-    if cpplint_out:
-        return f"[cpplint]\n{cpplint_out}"
-    return ""
+    return ["\n\n".join(parts) for parts in sections]
 
 
 def code_analyzer_node(state: BugHunterState) -> dict:
@@ -86,8 +191,11 @@ def code_analyzer_node(state: BugHunterState) -> dict:
     code = state["code"]
     context = state.get("context", "")
 
-    # Run static analysis (cpplint only)
-    static_output = _run_static_analysis(code)
+    # Run static analysis (cpplint) unless the CLI already did it for this
+    # row as part of a batch
+    static_output = state.get("static_analysis")
+    if static_output is None:
+        static_output = batch_static_analysis([code])[0]
 
     llm = get_llm(temperature=0)
 
@@ -97,47 +205,48 @@ def code_analyzer_node(state: BugHunterState) -> dict:
     if static_output:
         user_content += f"\n\nSTATIC ANALYSIS HINTS:\n{static_output}"
 
-    text = invoke_with_retry(
+    text, cache_hit = cached_invoke(
         llm,
         [SystemMessage(content=SYSTEM_PROMPT), HumanMessage(content=user_content)],
+        model=GROQ_MODEL,
+        temperature=0,
     )
 
     apis: list[str] = []
-    candidates: list[dict] = []
-
-    if "APIS:" in text:
-        apis_section = text.split("APIS:")[1]
-        if "CANDIDATES:" in apis_section:
-            apis_section = apis_section.split("CANDIDATES:")[0]
-        apis = [a.strip() for a in apis_section.strip().splitlines() if a.strip()]
-
-    if "CANDIDATES:" in text:
-        cand_section = text.split("CANDIDATES:")[1].strip()
-        for line in cand_section.splitlines():
-            parts = line.strip().split("|", 2)
-            if len(parts) == 3:
-                candidates.append(
-                    {
-                        "line_no": parts[0].strip(),
-                        "content": parts[1].strip(),
-                        "reason": parts[2].strip(),
-                    }
-                )
+    candidates: list[Candidate] = []
+
+    # Split once on the section labels; the first occurrence of each wins
+    sections: dict[str, str] = {}
+    parts = _SECTION_RE.split(text)
+    for label, body in zip(parts[1::2], parts[2::2]):
+        sections.setdefault(label, body)
+
+    apis_section = sections.get("APIS", "")
+    apis = [a.strip() for a in apis_section.splitlines() if a.strip()]
+
+    for m in _CAND_LINE_RE.finditer(sections.get("CANDIDATES", "")):
+        candidates.append(
+            Candidate(
+                line_no=m.group(1).strip(),
+                content=m.group(2).strip(),
+                reason=m.group(3).strip(),
+            )
+        )
+
+    # Generate search queries from APIs and the function names in candidate
+    # bug lines, deduplicated in first-seen order
+    search_queries = list(
+        dict.fromkeys(
+            [api + " correct usage" for api in apis[:8]]
+            + [
+                f"rdi {func} syntax parameters"
+                for cand in candidates[:5]
+                for func in _CALL_RE.findall(cand.content)[:2]
+            ]
+        )
+    )
 
-    # Generate search queries from APIs and candidate bug reasons
-    search_queries = [api + " correct usage" for api in apis[:8]]
-    
-    # Add queries based on candidate bug content for better doc retrieval
-    for cand in candidates[:5]:
-        content = cand.get("content", "")
-        # Extract function names from the candidate line
-        funcs = re.findall(r'\.(\w+)\s*\(', content)
-        for func in funcs[:2]:
-            query = f"rdi {func} syntax parameters"
-            if query not in search_queries:
-                search_queries.append(query)
-
-    print(f"  Extracted {len(apis)} APIs, {len(candidates)} candidate lines")
+    log.debug("  Extracted %d APIs, %d candidate lines", len(apis), len(candidates))
 
     return {
         "extracted_apis": apis,
@@ -146,4 +255,5 @@ def code_analyzer_node(state: BugHunterState) -> dict:
         "search_queries": search_queries,
         "iteration": 0,
         "max_iterations": state.get("max_iterations", 2),
+        "llm_cache_hit": cache_hit,
     }
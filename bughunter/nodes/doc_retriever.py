@@ -3,10 +3,13 @@
 from __future__ import annotations
 
 import asyncio
+import logging
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from bughunter.config import MCP_SERVER_URL
 from bughunter.state import BugHunterState
 
+log = logging.getLogger(__name__)
+
 
 async def _search_mcp(queries: list[str]) -> list[dict]:
     """Connect to the ABH MCP server and search for each query."""
@@ -30,7 +33,7 @@ async def _search_mcp(queries: list[str]) -> list[dict]:
             break
 
     if search_tool is None:
-        print("  search_documents tool not found on MCP server")
+        log.warning("  search_documents tool not found on MCP server")
         return []
 
     for query in queries:
@@ -52,7 +55,7 @@ async def _search_mcp(queries: list[str]) -> list[dict]:
                     {"text": str(result), "score": 0.5, "query": query}
                 )
         except Exception as e:
-            print(f"  MCP search failed for '{query}': {e}")
+            log.warning("  MCP search failed for '%s': %s", query, e)
 
     return all_results
 
@@ -66,8 +69,9 @@ def doc_retriever_node(state: BugHunterState) -> dict:
 
     if not queries:
         return {"doc_results": []}
+    query_history = state.get("query_history", []) + queries
 
-    print(f"  Searching MCP server with {len(queries)} queries")
+    log.debug("  Searching MCP server with %d queries", len(queries))
 
     try:
         loop = asyncio.get_event_loop()
@@ -91,5 +95,5 @@ def doc_retriever_node(state: BugHunterState) -> dict:
     unique.sort(key=lambda x: float(x.get("score", 0)), reverse=True)
     unique = unique[:20]
 
-    print(f"  Retrieved {len(unique)} unique doc chunks")
-    return {"doc_results": unique}
+    log.debug("  Retrieved %d unique doc chunks", len(unique))
+    return {"doc_results": unique, "query_history": query_history}
@@ -6,25 +6,12 @@ import re
 
 from bughunter.state import BugHunterState
 
-
-def _clean_line_numbers(raw: str) -> str:
-    """Extract and normalize line numbers to a clean comma-separated string."""
-    numbers = re.findall(r'\d+', raw)
-    if not numbers:
-        return "1"
-    seen: set[str] = set()
-    unique: list[str] = []
-    for n in numbers:
-        if n not in seen:
-            seen.add(n)
-            unique.append(n)
-    return ",".join(unique)
-
-
-def _clean_explanation(text: str) -> str:
-    """Clean explanation to be concise and human-readable."""
-    # Remove common verbose patterns
-    patterns_to_remove = [
+# Verbose phrases stripped from explanations, applied in order. Kept as
+# separate passes: the greedy end-of-text patterns must see the text that
+# earlier patterns left behind, which a single alternation does not do.
+_VERBOSE_PATTERNS = tuple(
+    re.compile(p, re.IGNORECASE | re.DOTALL)
+    for p in (
         r"Evidence:.*?(?=Line \d|$)",
         r"CONTEXT (?:says|states|mentions|quote).*?(?=Line \d|\.|$)",
         r"DOCS (?:state|mention|show).*?(?=Line \d|\.|$)",
@@ -40,21 +27,42 @@ def _clean_explanation(text: str) -> str:
         r"which implies.*?(?=\.|$)",
         r"The correct (?:code|answer|order).*?(?=\.|$)",
         r"Therefore,?.*?(?=\.|$)",
-    ]
-    
+    )
+)
+
+_DIGITS_RE = re.compile(r"\d+")
+_WS_RE = re.compile(r"\s+")
+_DOUBLE_PERIOD_RE = re.compile(r"\s*\.\s*\.")
+_SPACE_BEFORE_PERIOD_RE = re.compile(r"\s+\.")
+_DOUBLE_COMMA_RE = re.compile(r",\s*,")
+_LINE_LABEL_RE = re.compile(r"(Line \d+:)")
+_FIRST_SENTENCE_RE = re.compile(r"^(.*?[.!?])\s")
+
+
+def _clean_line_numbers(raw: str) -> str:
+    """Extract and normalize line numbers to a clean comma-separated string."""
+    numbers = _DIGITS_RE.findall(raw)
+    if not numbers:
+        return "1"
+    return ",".join(dict.fromkeys(numbers))
+
+
+def _clean_explanation(text: str) -> str:
+    """Clean explanation to be concise and human-readable."""
+    # Remove common verbose patterns
     result = text.strip()
-    for pattern in patterns_to_remove:
-        result = re.sub(pattern, "", result, flags=re.IGNORECASE | re.DOTALL)
-    
+    for pattern in _VERBOSE_PATTERNS:
+        result = pattern.sub("", result)
+
     # Clean up multiple spaces and normalize
-    result = re.sub(r'\s+', ' ', result).strip()
-    result = re.sub(r'\s*\.\s*\.', '.', result)  # Remove double periods
-    result = re.sub(r'\s+\.', '.', result)  # Fix spacing before periods
-    result = re.sub(r',\s*,', ',', result)  # Remove double commas
+    result = _WS_RE.sub(' ', result).strip()
+    result = _DOUBLE_PERIOD_RE.sub('.', result)  # Remove double periods
+    result = _SPACE_BEFORE_PERIOD_RE.sub('.', result)  # Fix spacing before periods
+    result = _DOUBLE_COMMA_RE.sub(',', result)  # Remove double commas
     
     # Split long explanations by "Line X:" and format nicely
     if len(result) > 200:
-        parts = re.split(r'(Line \d+:)', result)
+        parts = _LINE_LABEL_RE.split(result)
         if len(parts) > 2:
             formatted = []
             i = 1
@@ -62,7 +70,7 @@ def _clean_explanation(text: str) -> str:
                 if i + 1 < len(parts):
                     line_part = parts[i].strip() + " " + parts[i+1].strip()
                     # Take only first sentence of each line explanation
-                    first_sentence = re.match(r'^(.*?[.!?])\s', line_part + " ")
+                    first_sentence = _FIRST_SENTENCE_RE.match(line_part + " ")
                     if first_sentence:
                         formatted.append(first_sentence.group(1))
                     else:
@@ -91,12 +99,12 @@ def reporter_node(state: BugHunterState) -> dict:
     if not bug_line or bug_line == "1":
         candidates = state.get("candidate_lines", [])
         if candidates:
-            line_nos = [str(c.get("line_no", "")) for c in candidates if c.get("line_no")]
+            line_nos = [c.line_no for c in candidates if c.line_no]
             if line_nos:
                 bug_line = ",".join(line_nos[:3])
             if not bug_explanation:
                 bug_explanation = "; ".join(
-                    c.get("reason", "") for c in candidates[:3] if c.get("reason")
+                    c.reason for c in candidates[:3] if c.reason
                 )
 
     if not bug_line:
@@ -2,16 +2,28 @@
 
 from __future__ import annotations
 
+import functools
+import io
+import logging
+import re
+from typing import Literal
+
+from groq import BadRequestError
 from langchain_core.messages import SystemMessage, HumanMessage
+from pydantic import BaseModel, ValidationError, field_validator
 
-from bughunter.llm import get_llm, invoke_with_retry
+from bughunter.config import GROQ_MODEL
+from bughunter.llm import get_llm
+from bughunter.llm_cache import cached_invoke
 from bughunter.state import BugHunterState
 
+log = logging.getLogger(__name__)
+
 
 SYSTEM_PROMPT = """\
 You are a precise C++ RDI semiconductor bug verifier.
 
-You receive BUGGY CODE (numbered), CONTEXT, CANDIDATE LINES, DOCS, and STATIC hints.
+You receive BUGGY CODE (numbered), CONTEXT, STATIC hints, CANDIDATE LINES, and DOCS.
 
 VERIFICATION PROCESS:
 1. Read the CONTEXT carefully - it often explicitly describes what bug exists.
@@ -52,27 +64,113 @@ Do NOT include:
 - Repetitive explanations
 - Hedging words
 
-Output format (no markdown, no fences):
+Output a single JSON object (no markdown, no fences):
 
-CONFIDENCE: high|low
-BUG_LINES: <comma-separated line numbers>
-EXPLANATION: <short human-readable explanation>
+{"confidence": "high" | "low",
+ "bug_lines": [<line numbers>],
+ "explanation": "<short human-readable explanation>",
+ "refined_queries": [<doc search queries to try next, only when confidence is low>]}
 """
 
+# Built once and shared by every call
+_SYSTEM_MSG = SystemMessage(content=SYSTEM_PROMPT)
+
+# Fields that stay fixed across retries for the same bug come first and
+# DOCS (the only field a retry changes) last, maximizing the prompt
+# prefix shared between calls for provider-side prefix caching.
+_USER_TEMPLATE = (
+    "BUGGY CODE (with line numbers):\n{code}\n\n"
+    "CONTEXT: {context}\n\n"
+    "STATIC: {static}\n\n"
+    "CANDIDATES:\n{candidates}\n\n"
+    "DOCS:\n{docs}"
+)
+
+
+_DIGITS_RE = re.compile(r"\d+")
+
+
+class VerifierResult(BaseModel):
+    """Verifier answer, parsed from the model's JSON output."""
+
+    confidence: Literal["high", "low"] = "low"
+    bug_lines: list[str] = []
+    explanation: str = ""
+    refined_queries: list[str] = []
+
+    @field_validator("confidence", mode="before")
+    @classmethod
+    def _normalize_confidence(cls, value: object) -> str:
+        # Anything but an explicit "high" ("medium", null, ...) counts as low
+        return "high" if str(value).strip().lower() == "high" else "low"
+
+    @field_validator("bug_lines", mode="before")
+    @classmethod
+    def _normalize_lines(cls, value: object) -> list[str]:
+        # Accept 5, "5, 7", ["5-7"], [5, "L7"], ... like the reporter does
+        if isinstance(value, (list, tuple)):
+            value = ",".join(str(v) for v in value)
+        return list(dict.fromkeys(_DIGITS_RE.findall(str(value or ""))))
+
+    @field_validator("explanation", mode="before")
+    @classmethod
+    def _none_to_empty(cls, value: object) -> object:
+        return "" if value is None else value
+
+    @field_validator("refined_queries", mode="before")
+    @classmethod
+    def _none_or_str_to_list(cls, value: object) -> object:
+        # High-confidence answers often send null; a lone query is a string
+        if value is None:
+            return []
+        return [value] if isinstance(value, str) else value
+
+def _is_valid_result(text: str) -> bool:
+    """Whether the text passes the VerifierResult schema (worth caching)."""
+    try:
+        VerifierResult.model_validate_json(text)
+    except ValidationError:
+        return False
+    return True
+
+
+# Per-field prompt budgets, in characters
 MAX_DOC_CHARS = 6000
 MAX_CODE_CHARS = 4000
+MAX_CONTEXT_CHARS = 1000
+MAX_STATIC_CHARS = 500
+MAX_SNIPPET_CHARS = 1200
+MAX_DOC_SNIPPETS = 5
+# Word-trigram Jaccard similarity above which two doc snippets count as one
+NEAR_DUP_JACCARD = 0.8
 
 
+@functools.lru_cache(maxsize=64)
 def _truncate(text: str, max_chars: int) -> str:
     if len(text) <= max_chars:
         return text
     return text[:max_chars] + "\n... [truncated]"
 
 
+@functools.lru_cache(maxsize=64)
 def _number_lines(code: str) -> str:
-    """Add line numbers to code for reference."""
-    lines = code.splitlines()
-    return "\n".join(f"{i}: {line}" for i, line in enumerate(lines, 1))
+    """Add line numbers to code for reference (memoized across retries)."""
+    # A list comprehension beats a generator here: str.join builds a list
+    # from its argument anyway.
+    return "\n".join([f"{i}: {line}" for i, line in enumerate(code.splitlines(), 1)])
+
+
+def _shingles(text: str) -> frozenset:
+    """Word trigrams of the text, for near-duplicate detection."""
+    words = text.split()
+    if len(words) < 3:
+        # Too short for trigrams: only an identical snippet is a duplicate
+        return frozenset([tuple(words)])
+    return frozenset(zip(words, words[1:], words[2:]))
+
+
+def _is_near_duplicate(a: frozenset, b: frozenset) -> bool:
+    return len(a & b) / len(a | b) >= NEAR_DUP_JACCARD
 
 
 def verifier_node(state: BugHunterState) -> dict:
@@ -80,76 +178,104 @@ def verifier_node(state: BugHunterState) -> dict:
     code = state["code"]
     numbered_code = _number_lines(code)
     numbered_code = _truncate(numbered_code, MAX_CODE_CHARS)
-    context = state.get("context", "")[:1000]
+    context = state.get("context", "")[:MAX_CONTEXT_CHARS]
     candidates = state.get("candidate_lines", [])[:5]
     doc_results = state.get("doc_results", [])
-    static_analysis = state.get("static_analysis", "")[:500]
+    static_analysis = state.get("static_analysis", "")[:MAX_STATIC_CHARS]
     iteration = state.get("iteration", 0)
 
+    # Nothing to verify, or no evidence to cite: skip the LLM call
+    if not candidates or (not doc_results and not context):
+        iteration += 1
+        log.debug("  Skipped verification (iter %d): no candidates or evidence", iteration)
+        return {
+            "bug_line": "",
+            "bug_explanation": "",
+            "confidence": "low",
+            "iteration": iteration,
+            # Re-running the same search would return the same nothing
+            "search_queries": [],
+        }
+
     cand_text = "\n".join(
-        f"L{c['line_no']}: {c['content']} - {c['reason']}" for c in candidates
+        f"L{c.line_no}: {c.content} - {c.reason}" for c in candidates
     )
 
-    doc_snippets = []
+    # Render DOCS in one pass, stopping at the snippet or character budget
+    docs_buf = io.StringIO()
+    kept_shingles: list[frozenset] = []
     total_doc_chars = 0
-    for d in doc_results[:5]:
-        snippet = d.get("text", "")[:1200]
+    for d in doc_results:
+        if len(kept_shingles) == MAX_DOC_SNIPPETS:
+            break
+        snippet = d.get("text", "")[:MAX_SNIPPET_CHARS]
+        # Overlapping chunks of the same doc would only spend the budget twice
+        shingles = _shingles(snippet)
+        if any(_is_near_duplicate(shingles, seen) for seen in kept_shingles):
+            continue
         if total_doc_chars + len(snippet) > MAX_DOC_CHARS:
             break
-        doc_snippets.append(f"[{d.get('score', '?')}] {snippet}")
+        if kept_shingles:
+            docs_buf.write("\n---\n")
+        kept_shingles.append(shingles)
+        docs_buf.write(f"[{d.get('score', '?')}] ")
+        docs_buf.write(snippet)
         total_doc_chars += len(snippet)
-    doc_text = "\n---\n".join(doc_snippets) if doc_snippets else "No docs found."
-
-    user_content = (
-        f"BUGGY CODE (with line numbers):\n{numbered_code}\n\n"
-        f"CONTEXT: {context}\n\n"
-        f"CANDIDATES:\n{cand_text}\n\n"
-        f"DOCS:\n{doc_text}\n\n"
-        f"STATIC: {static_analysis}"
+    doc_text = docs_buf.getvalue() or "No docs found."
+
+    user_content = _USER_TEMPLATE.format(
+        code=numbered_code,
+        context=context,
+        static=static_analysis,
+        candidates=cand_text,
+        docs=doc_text,
     )
 
-    llm = get_llm(temperature=0)
-    text = invoke_with_retry(
-        llm,
-        [SystemMessage(content=SYSTEM_PROMPT), HumanMessage(content=user_content)],
-    )
-
-    confidence = "low"
-    bug_line = ""
-    bug_explanation = ""
-    refined_queries: list[str] = []
-
-    for line in text.splitlines():
-        line_stripped = line.strip()
-        if line_stripped.startswith("CONFIDENCE:"):
-            confidence = line_stripped.split(":", 1)[1].strip().lower()
-        elif line_stripped.startswith("BUG_LINES:"):
-            bug_line = line_stripped.split(":", 1)[1].strip()
-        elif line_stripped.startswith("BUG_LINE:"):
-            bug_line = line_stripped.split(":", 1)[1].strip()
-
-    if "EXPLANATION:" in text:
-        expl_section = text.split("EXPLANATION:", 1)[1]
-        if "REFINED_QUERIES:" in expl_section:
-            expl_section = expl_section.split("REFINED_QUERIES:")[0]
-        bug_explanation = expl_section.strip()
-
-    if "REFINED_QUERIES:" in text:
-        rq_section = text.split("REFINED_QUERIES:")[1].strip()
-        refined_queries = [q.strip() for q in rq_section.splitlines() if q.strip()]
+    # JSON mode guarantees a parseable object; the schema check is ours
+    llm = get_llm(temperature=0).bind(response_format={"type": "json_object"})
+    # Unusable output falls back to low confidence, leaving the reporter
+    # to use the candidate lines
+    answer = VerifierResult()
+    cache_hit = False
+    try:
+        text, cache_hit = cached_invoke(
+            llm,
+            [_SYSTEM_MSG, HumanMessage(content=user_content)],
+            model=GROQ_MODEL,
+            temperature=0,
+            accept=_is_valid_result,
+        )
+        answer = VerifierResult.model_validate_json(text)
+    except BadRequestError as e:
+        # Groq answers a generation that is not valid JSON with a 400
+        if "json_validate_failed" not in str(e):
+            raise
+        log.warning("  Verifier output rejected by JSON mode")
+    except ValidationError as e:
+        log.warning("  Unusable verifier output: %d schema error(s)", e.error_count())
+
+    confidence = answer.confidence
+    bug_line = ",".join(answer.bug_lines)
+    bug_explanation = answer.explanation.strip()
+    refined_queries = [q.strip() for q in answer.refined_queries if q.strip()]
 
     iteration += 1
-    print(f"  Verified (iter {iteration}): confidence={confidence}, lines={bug_line}")
+    log.debug(
+        "  Verified (iter %d): confidence=%s, lines=%s", iteration, confidence, bug_line
+    )
 
     result: dict = {
         "bug_line": bug_line,
         "bug_explanation": bug_explanation,
         "confidence": confidence,
         "iteration": iteration,
+        "llm_cache_hit": bool(state.get("llm_cache_hit")) and cache_hit,
     }
 
-    if confidence == "low" and refined_queries:
-        result["search_queries"] = refined_queries
+    if confidence == "low":
+        # Only queries not searched yet can bring back different docs
+        tried = set(state.get("query_history", []))
+        result["search_queries"] = [q for q in refined_queries if q not in tried]
 
     return result
 
@@ -162,4 +288,10 @@ def should_retry(state: BugHunterState) -> str:
 
     if confidence == "high" or iteration >= max_iter:
         return "reporter"
+    # Candidates only come from code_analyzer; more docs cannot create them
+    if not state.get("candidate_lines"):
+        return "reporter"
+    # No new queries means the retriever would return the same docs again
+    if not state.get("search_queries"):
+        return "reporter"
     return "doc_retriever"
@@ -1,9 +1,19 @@
 """LangGraph state schema for the BugHunter pipeline."""
 
 from __future__ import annotations
+from dataclasses import dataclass
 from typing import TypedDict
 
 
+@dataclass(slots=True, frozen=True)
+class Candidate:
+    """A suspected bug line reported by code_analyzer."""
+
+    line_no: str
+    content: str
+    reason: str
+
+
 class BugHunterState(TypedDict, total=False):
     """Shared state that flows through every node in the graph."""
 
@@ -16,10 +26,11 @@ class BugHunterState(TypedDict, total=False):
 
     # ── Intermediate fields ────────────────────────────────────────────
     extracted_apis: list[str]        # API/function names found in code
-    candidate_lines: list[dict]      # [{line_no, content, reason}, ...]
+    candidate_lines: list[Candidate] # suspected bug lines
     doc_results: list[dict]          # [{text, score}, ...] from MCP
     static_analysis: str             # raw cppcheck / heuristic output
     search_queries: list[str]        # queries sent to MCP search
+    query_history: list[str]         # every query already searched
 
     # ── Output fields ──────────────────────────────────────────────────
     bug_line: str                    # identified bug line content
@@ -30,3 +41,4 @@ class BugHunterState(TypedDict, total=False):
     max_iterations: int              # cap for the loop (default 2)
     confidence: str                  # "high" | "low"
     error: str                       # error message if something fails
+    llm_cache_hit: bool              # every LLM response so far came from cache